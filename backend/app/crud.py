@@ -2,19 +2,85 @@
 CRUD operations for the Threat model.
 Separates database logic from API routes.
 """
-from typing import List, Optional
-from sqlalchemy.orm import Session
-from sqlalchemy import desc
+import sqlite3
+import time
+from typing import AsyncIterator, List, Optional, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import Row, delete, desc, func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from . import models, schemas
 
 
-def get_threats(
-    db: Session,
+# Columns serialized by ThreatResponse. List endpoints select these directly
+# and return lightweight Row objects instead of hydrating ORM instances.
+_THREAT_COLUMNS = (
+    models.Threat.id,
+    models.Threat.type,
+    models.Threat.value,
+    models.Threat.severity,
+    models.Threat.date_detected,
+    models.Threat.source,
+)
+
+
+# Dashboard statistics are polled frequently but only change on writes.
+# Cache them briefly in-process and drop the cache on create/delete.
+# "version" counts writes so a computation that raced with a write is not
+# stored after the invalidation.
+STATS_CACHE_TTL = 5.0
+_stats_cache = {"value": None, "expires": 0.0, "version": 0}
+
+
+def _invalidate_statistics() -> None:
+    """Discard cached dashboard statistics after a write."""
+    _stats_cache["value"] = None
+    _stats_cache["version"] += 1
+
+
+# Rows per multi-row INSERT in create_threats_bulk (5 bound params per row).
+# SQLite before 3.32 allows at most 999 bound variables per statement.
+BULK_INSERT_CHUNK = 500
+BULK_INSERT_PARAMS_PER_ROW = 5
+LEGACY_SQLITE_MAX_VARIABLES = 999
+
+
+def _bulk_chunk_size(db: AsyncSession) -> int:
+    """Return how many rows fit in one multi-row INSERT for this database."""
+    if db.bind.dialect.name == "sqlite" and sqlite3.sqlite_version_info < (3, 32):
+        return LEGACY_SQLITE_MAX_VARIABLES // BULK_INSERT_PARAMS_PER_ROW
+    return BULK_INSERT_CHUNK
+
+
+# Rows fetched per batch by stream_threats
+STREAM_BATCH_SIZE = 200
+
+
+def _filters(threat_type: Optional[str], severity: Optional[str]) -> list:
+    """Build the WHERE conditions shared by the list, page, stream and count queries."""
+    conditions = []
+    if threat_type:
+        conditions.append(models.Threat.type == threat_type)
+    if severity:
+        conditions.append(models.Threat.severity == severity)
+    return conditions
+
+
+def _insert(db: AsyncSession):
+    """Return the dialect-specific insert() that supports ON CONFLICT."""
+    if db.bind.dialect.name == "postgresql":
+        return pg_insert
+    return sqlite_insert
+
+
+async def get_threats(
+    db: AsyncSession,
     skip: int = 0,
     limit: int = 100,
     threat_type: Optional[str] = None,
     severity: Optional[str] = None
-) -> List[models.Threat]:
+) -> List[Row]:
     """
     Retrieve threats with optional filtering.
     
@@ -26,98 +92,230 @@ def get_threats(
         severity: Filter by severity level
     
     Returns:
-        List of Threat objects
+        List of rows exposing the Threat columns as attributes
     """
-    query = db.query(models.Threat)
+    stmt = (
+        select(*_THREAT_COLUMNS)
+        .where(*_filters(threat_type, severity))
+        .order_by(desc(models.Threat.date_detected), desc(models.Threat.id))
+        .offset(skip)
+        .limit(limit)
+    )
+    result = await db.execute(stmt)
+    return result.all()
+
+
+async def get_threats_page(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 100,
+    threat_type: Optional[str] = None,
+    severity: Optional[str] = None
+) -> Tuple[List[Row], int]:
+    """
+    Retrieve a page of threats together with the total matching count.
     
-    if threat_type:
-        query = query.filter(models.Threat.type == threat_type)
-    if severity:
-        query = query.filter(models.Threat.severity == severity)
+    The total is computed with COUNT(*) OVER () in the same query, so
+    pagination needs a single round-trip.
     
-    return query.order_by(desc(models.Threat.date_detected)).offset(skip).limit(limit).all()
+    Returns:
+        Tuple of (list of Threat rows, total matching threats)
+    """
+    stmt = (
+        select(*_THREAT_COLUMNS, func.count().over().label("total"))
+        .where(*_filters(threat_type, severity))
+        .order_by(desc(models.Threat.date_detected), desc(models.Threat.id))
+        .offset(skip)
+        .limit(limit)
+    )
+    rows = (await db.execute(stmt)).all()
+    
+    if not rows:
+        # Past the last page the window yields nothing; count separately
+        total = await get_threat_count(db, threat_type, severity) if skip else 0
+        return [], total
+    return rows, rows[0].total
 
 
-def get_threat_count(
-    db: Session,
+async def stream_threats(
+    db: AsyncSession,
+    threat_type: Optional[str] = None,
+    severity: Optional[str] = None
+) -> AsyncIterator[Row]:
+    """
+    Stream all matching threats without materializing them in memory.
+    
+    Rows are fetched from a server-side cursor in batches of
+    STREAM_BATCH_SIZE, so peak memory stays bounded for large exports.
+    """
+    stmt = (
+        select(*_THREAT_COLUMNS)
+        .where(*_filters(threat_type, severity))
+        .order_by(desc(models.Threat.date_detected))
+        .execution_options(yield_per=STREAM_BATCH_SIZE)
+    )
+    result = await db.stream(stmt)
+    async for row in result:
+        yield row
+
+
+async def get_threat_count(
+    db: AsyncSession,
     threat_type: Optional[str] = None,
     severity: Optional[str] = None
 ) -> int:
     """Get total count of threats with optional filtering."""
-    query = db.query(models.Threat)
-    
-    if threat_type:
-        query = query.filter(models.Threat.type == threat_type)
-    if severity:
-        query = query.filter(models.Threat.severity == severity)
-    
-    return query.count()
+    stmt = select(func.count()).select_from(models.Threat).where(*_filters(threat_type, severity))
+    result = await db.execute(stmt)
+    return result.scalar_one()
 
 
-def get_threat_by_id(db: Session, threat_id: int) -> Optional[models.Threat]:
+async def get_threat_by_id(db: AsyncSession, threat_id: int) -> Optional[models.Threat]:
     """Retrieve a single threat by ID."""
-    return db.query(models.Threat).filter(models.Threat.id == threat_id).first()
+    result = await db.execute(select(models.Threat).where(models.Threat.id == threat_id))
+    return result.scalars().first()
 
 
-def get_threat_by_value(db: Session, value: str) -> Optional[models.Threat]:
+async def get_threat_by_value(db: AsyncSession, value: str) -> Optional[models.Threat]:
     """Check if a threat with this value already exists."""
-    return db.query(models.Threat).filter(models.Threat.value == value).first()
+    result = await db.execute(select(models.Threat).where(models.Threat.value == value))
+    return result.scalars().first()
 
 
-def create_threat(db: Session, threat: schemas.ThreatCreate) -> models.Threat:
+async def create_threat(db: AsyncSession, threat: schemas.ThreatCreate) -> Optional[models.Threat]:
     """
     Create a new threat record.
     
+    Uses INSERT ... ON CONFLICT DO NOTHING RETURNING so duplicate detection
+    and the insert happen atomically in a single statement.
+    
     Args:
         db: Database session
         threat: Validated threat data
     
     Returns:
-        Created Threat object
+        Created Threat object, or None if the value already exists
     """
-    db_threat = models.Threat(
-        type=threat.type.value,
-        value=threat.value,
-        severity=threat.severity.value,
-        source=threat.source
-    )
-    db.add(db_threat)
-    db.commit()
-    db.refresh(db_threat)
+    values = {
+        "type": threat.type.value,
+        "value": threat.value,
+        "severity": threat.severity.value,
+        "source": threat.source,
+    }
+    if db.bind.dialect.insert_returning:
+        stmt = (
+            _insert(db)(models.Threat)
+            .values(**values)
+            .on_conflict_do_nothing(index_elements=[models.Threat.value])
+            .returning(models.Threat)
+        )
+        result = await db.execute(stmt)
+        db_threat = result.scalar_one_or_none()
+        await db.commit()
+    else:
+        # SQLite < 3.35 has no RETURNING: insert through the ORM and reload
+        db_threat = models.Threat(**values)
+        db.add(db_threat)
+        try:
+            await db.commit()
+        except IntegrityError:
+            await db.rollback()
+            return None
+        await db.refresh(db_threat)
+    if db_threat is not None:
+        _invalidate_statistics()
     return db_threat
 
 
-def delete_threat(db: Session, threat_id: int) -> bool:
+async def create_threats_bulk(db: AsyncSession, threats: List[schemas.ThreatCreate]) -> int:
+    """
+    Insert many threats in one transaction, skipping existing values.
+    
+    Rows are sent as multi-row INSERT ... ON CONFLICT DO NOTHING statements
+    in chunks sized by _bulk_chunk_size() to stay under the database's
+    bound-parameter limit. Requires SQLite >= 3.24 (ON CONFLICT).
+    
+    Returns:
+        Number of threats actually created
+    """
+    chunk_size = _bulk_chunk_size(db)
+    created = 0
+    for start in range(0, len(threats), chunk_size):
+        rows = [
+            {
+                "type": threat.type.value,
+                "value": threat.value,
+                "severity": threat.severity.value,
+                "source": threat.source,
+            }
+            for threat in threats[start:start + chunk_size]
+        ]
+        stmt = (
+            _insert(db)(models.Threat)
+            .values(rows)
+            .on_conflict_do_nothing(index_elements=[models.Threat.value])
+        )
+        if db.bind.dialect.insert_returning:
+            result = await db.execute(stmt.returning(models.Threat.id))
+            created += len(result.all())
+        else:
+            # SQLite 3.24-3.34: ON CONFLICT but no RETURNING. Chunks here are
+            # already sized for the pre-3.32 variable limit by _bulk_chunk_size()
+            result = await db.execute(stmt)
+            created += result.rowcount
+    await db.commit()
+    if created:
+        _invalidate_statistics()
+    return created
+
+
+async def delete_threat(db: AsyncSession, threat_id: int) -> bool:
     """
     Delete a threat by ID.
     
     Returns:
         True if deleted, False if not found
     """
-    threat = get_threat_by_id(db, threat_id)
-    if threat:
-        db.delete(threat)
-        db.commit()
+    result = await db.execute(delete(models.Threat).where(models.Threat.id == threat_id))
+    await db.commit()
+    if result.rowcount > 0:
+        _invalidate_statistics()
         return True
     return False
 
 
-def get_statistics(db: Session) -> dict:
-    """Get threat statistics for dashboard."""
-    total = db.query(models.Threat).count()
+async def get_statistics(db: AsyncSession) -> dict:
+    """
+    Get threat statistics for dashboard.
+
+    Uses one GROUP BY query per dimension instead of a COUNT per value,
+    so the dashboard costs two round-trips regardless of category count.
+    Results are cached for STATS_CACHE_TTL seconds or until the next write.
+    """
+    if _stats_cache["value"] is not None and time.monotonic() < _stats_cache["expires"]:
+        return _stats_cache["value"]
+    version = _stats_cache["version"]
     
-    by_type = {}
-    for threat_type in ['IP', 'Hash', 'URL', 'Domain']:
-        count = db.query(models.Threat).filter(models.Threat.type == threat_type).count()
+    by_type = {threat_type: 0 for threat_type in ['IP', 'Hash', 'URL', 'Domain']}
+    type_rows = await db.execute(
+        select(models.Threat.type, func.count()).group_by(models.Threat.type)
+    )
+    for threat_type, count in type_rows.all():
         by_type[threat_type] = count
     
-    by_severity = {}
-    for severity in ['High', 'Medium', 'Low']:
-        count = db.query(models.Threat).filter(models.Threat.severity == severity).count()
+    by_severity = {severity: 0 for severity in ['High', 'Medium', 'Low']}
+    severity_rows = await db.execute(
+        select(models.Threat.severity, func.count()).group_by(models.Threat.severity)
+    )
+    for severity, count in severity_rows.all():
         by_severity[severity] = count
     
-    return {
-        "total": total,
+    stats = {
+        "total": sum(by_type.values()),
         "by_type": by_type,
         "by_severity": by_severity
     }
+    if _stats_cache["version"] == version:
+        _stats_cache["value"] = stats
+        _stats_cache["expires"] = time.monotonic() + STATS_CACHE_TTL
+    return stats
@@ -3,9 +3,15 @@ Database configuration and session management.
 Supports SQLite (dev) and PostgreSQL (prod) via environment variable.
 """
 import os
-from sqlalchemy import create_engine
+from asyncio import current_task
+from sqlalchemy import event
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.ext.asyncio import (
+    async_scoped_session,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
 
 # Use DATABASE_URL env var or default to SQLite
 # In Docker, uses /app/data/ which is mounted as a persistent volume
@@ -15,22 +21,68 @@ DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:////app/data/ioc_manager.db")
 if DATABASE_URL.startswith("postgres://"):
     DATABASE_URL = DATABASE_URL.replace("postgres://", "postgresql://", 1)
 
+# Select async drivers so plain URLs keep working (aiosqlite / asyncpg)
+if DATABASE_URL.startswith("sqlite://"):
+    DATABASE_URL = DATABASE_URL.replace("sqlite://", "sqlite+aiosqlite://", 1)
+elif DATABASE_URL.startswith("postgresql://"):
+    DATABASE_URL = DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://", 1)
+
 # SQLite requires special connect_args
 connect_args = {"check_same_thread": False} if "sqlite" in DATABASE_URL else {}
 
-engine = create_engine(DATABASE_URL, connect_args=connect_args)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Server databases get an explicitly sized pool: fail fast instead of queuing
+# 30s for a connection, and detect/recycle stale sockets on long-lived workers.
+# File-based SQLite would otherwise get NullPool from the aiosqlite dialect
+# (a new connection and worker thread per request), so pool it explicitly;
+# in-memory SQLite keeps the dialect's default pool.
+if "sqlite" not in DATABASE_URL:
+    pool_options = {
+        "pool_size": 20,
+        "max_overflow": 10,
+        "pool_timeout": 5,
+        "pool_pre_ping": True,
+        "pool_recycle": 3600,
+    }
+elif ":memory:" in DATABASE_URL or DATABASE_URL.endswith("://"):
+    pool_options = {}
+else:
+    pool_options = {"poolclass": AsyncAdaptedQueuePool}
+
+engine = create_async_engine(DATABASE_URL, connect_args=connect_args, **pool_options)
+
+if "sqlite" in DATABASE_URL:
+    @event.listens_for(engine.sync_engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        """
+        Enable WAL so readers and a writer don't block each other, and
+        tune caching for the dev/default SQLite database.
+        cache_size and mmap_size are per connection, so they only pay off
+        because file databases use a connection pool (see pool_options).
+        """
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA cache_size=-65536")  # 64 MiB
+        cursor.execute("PRAGMA mmap_size=268435456")  # 256 MiB
+        cursor.close()
+
+# expire_on_commit=False: attributes must stay loaded after commit, since
+# async sessions cannot lazy-load them while the response is serialized.
+# Sessions are scoped to the current asyncio task (one per request), so any
+# code running for the same request shares a single session.
+SessionFactory = async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+SessionLocal = async_scoped_session(SessionFactory, scopefunc=current_task)
 
 Base = declarative_base()
 
 
-def get_db():
+async def get_db():
     """
-    Dependency that provides a database session.
+    Dependency that provides an async database session.
     Ensures proper cleanup after each request.
     """
-    db = SessionLocal()
     try:
-        yield db
+        yield SessionLocal()
     finally:
-        db.close()
+        await SessionLocal.remove()
@@ -2,22 +2,39 @@
 IOC Manager API - FastAPI Application
 Centralized management of Indicators of Compromise for Blue Teams.
 """
+from contextlib import asynccontextmanager
 from datetime import datetime
 from typing import Optional, List
-from fastapi import FastAPI, Depends, HTTPException, Query
+from fastapi import FastAPI, Body, Depends, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse, HTMLResponse
+from fastapi.responses import FileResponse, HTMLResponse, ORJSONResponse, StreamingResponse
 from fastapi.openapi.docs import get_redoc_html
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 import os
+import orjson
 
 from . import crud, models, schemas
-from .database import engine, get_db
+from .database import SessionFactory, engine, get_db
+
+# Liveness query, built once and reused by every health check
+_PING = text("SELECT 1")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Application startup/shutdown.
+    Creates database tables before serving (the connection used for this
+    is returned to the pool, so the first request can reuse it), then
+    releases pooled connections on shutdown.
+    """
+    async with engine.begin() as conn:
+        await conn.run_sync(models.Base.metadata.create_all)
+    yield
+    await engine.dispose()
 
-# Create database tables
-models.Base.metadata.create_all(bind=engine)
 
 # Initialize FastAPI with OpenAPI documentation
 app = FastAPI(
@@ -53,6 +70,8 @@ API REST para equipos de Blue Team que permite:
     },
     docs_url="/docs",
     redoc_url=None,  # Custom ReDoc with stable version
+    default_response_class=ORJSONResponse,  # Faster JSON encoding for list endpoints
+    lifespan=lifespan,
 )
 
 # CORS configuration - allow frontend to communicate with API
@@ -86,11 +105,12 @@ async def redoc_html():
     summary="Health Check",
     description="Verify API and database connectivity status."
 )
-def health_check(db: Session = Depends(get_db)):
+async def health_check():
     """Check if the API and database are operational."""
     try:
-        # Test database connection
-        db.execute(text("SELECT 1"))
+        # Test database connection directly on the engine (no ORM session)
+        async with engine.connect() as conn:
+            await conn.execute(_PING)
         db_status = "connected"
     except Exception as e:
         db_status = f"error: {str(e)}"
@@ -111,12 +131,12 @@ def health_check(db: Session = Depends(get_db)):
     summary="List all threats",
     description="Retrieve all IOCs with optional filtering by type and severity."
 )
-def list_threats(
+async def list_threats(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum records to return"),
     type: Optional[str] = Query(None, description="Filter by IOC type (IP, Hash, URL, Domain)"),
     severity: Optional[str] = Query(None, description="Filter by severity (High, Medium, Low)"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Retrieve all registered IOCs.
@@ -126,10 +146,61 @@ def list_threats(
     - **type**: Optional filter by IOC type
     - **severity**: Optional filter by severity level
     """
-    threats = crud.get_threats(db, skip=skip, limit=limit, threat_type=type, severity=severity)
+    threats = await crud.get_threats(db, skip=skip, limit=limit, threat_type=type, severity=severity)
     return threats
 
 
+@app.get(
+    "/api/threats/page",
+    response_model=schemas.ThreatList,
+    tags=["Threats"],
+    summary="List threats with total count",
+    description="Retrieve a page of IOCs together with the total number of matching records."
+)
+async def list_threats_page(
+    skip: int = Query(0, ge=0, description="Number of records to skip"),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum records to return"),
+    type: Optional[str] = Query(None, description="Filter by IOC type (IP, Hash, URL, Domain)"),
+    severity: Optional[str] = Query(None, description="Filter by severity (High, Medium, Low)"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Retrieve a paginated list of IOCs.
+    
+    - **total**: Number of IOCs matching the filters (ignores skip/limit)
+    - **threats**: The requested page of IOCs
+    """
+    threats, total = await crud.get_threats_page(db, skip=skip, limit=limit, threat_type=type, severity=severity)
+    return {"total": total, "threats": threats}
+
+
+@app.get(
+    "/api/threats/stream",
+    tags=["Threats"],
+    summary="Stream all threats",
+    description="Export every matching IOC as newline-delimited JSON (one object per line).",
+    response_class=StreamingResponse
+)
+async def stream_threats(
+    type: Optional[str] = Query(None, description="Filter by IOC type (IP, Hash, URL, Domain)"),
+    severity: Optional[str] = Query(None, description="Filter by severity (High, Medium, Low)")
+):
+    """
+    Stream all registered IOCs as NDJSON.
+    
+    Unlike **/api/threats**, there is no page limit; rows are sent as they are
+    read from the database, so large exports use constant memory.
+    """
+    async def generate():
+        # The body is sent after this handler returns, so the generator owns
+        # its session instead of relying on get_db teardown timing
+        async with SessionFactory() as db:
+            async for row in crud.stream_threats(db, threat_type=type, severity=severity):
+                yield orjson.dumps(dict(row._mapping)) + b"\n"
+    
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+
 @app.post(
     "/api/threats",
     response_model=schemas.ThreatResponse,
@@ -138,9 +209,9 @@ def list_threats(
     summary="Register new threat",
     description="Add a new IOC to the database. The IOC value must be unique."
 )
-def create_threat(
+async def create_threat(
     threat: schemas.ThreatCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Register a new Indicator of Compromise.
@@ -150,15 +221,42 @@ def create_threat(
     - **severity**: Threat level (High, Medium, Low)
     - **source**: Optional source identifier
     """
-    # Check for duplicate
-    existing = crud.get_threat_by_value(db, threat.value)
-    if existing:
+    db_threat = await crud.create_threat(db, threat)
+    if db_threat is None:
+        existing = await crud.get_threat_by_value(db, threat.value)
         raise HTTPException(
             status_code=409,
-            detail=f"IOC with value '{threat.value}' already exists (ID: {existing.id})"
+            detail=f"IOC with value '{threat.value}' already exists (ID: {existing.id if existing else 'unknown'})"
         )
     
-    return crud.create_threat(db, threat)
+    return db_threat
+
+
+@app.post(
+    "/api/threats/bulk",
+    response_model=schemas.BulkCreateResponse,
+    status_code=201,
+    tags=["Threats"],
+    summary="Register threats in bulk",
+    description="Add many IOCs in a single request and transaction. Existing values are skipped."
+)
+async def create_threats_bulk(
+    threats: List[schemas.ThreatCreate] = Body(..., max_length=1000, description="IOCs to register (max 1000)"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Register a batch of Indicators of Compromise.
+    
+    Intended for detectors and integrations that report many IOCs per run.
+    Duplicate values are ignored instead of failing the whole batch.
+    At most 1000 IOCs are accepted per request.
+    """
+    created = await crud.create_threats_bulk(db, threats) if threats else 0
+    return {
+        "received": len(threats),
+        "created": created,
+        "duplicates": len(threats) - created
+    }
 
 
 @app.get(
@@ -168,9 +266,9 @@ def create_threat(
     summary="Get threat by ID",
     description="Retrieve a specific IOC by its unique identifier."
 )
-def get_threat(threat_id: int, db: Session = Depends(get_db)):
+async def get_threat(threat_id: int, db: AsyncSession = Depends(get_db)):
     """Retrieve details of a specific threat."""
-    threat = crud.get_threat_by_id(db, threat_id)
+    threat = await crud.get_threat_by_id(db, threat_id)
     if not threat:
         raise HTTPException(status_code=404, detail=f"Threat with ID {threat_id} not found")
     return threat
@@ -183,9 +281,9 @@ def get_threat(threat_id: int, db: Session = Depends(get_db)):
     summary="Delete threat",
     description="Remove an IOC from the database."
 )
-def delete_threat(threat_id: int, db: Session = Depends(get_db)):
+async def delete_threat(threat_id: int, db: AsyncSession = Depends(get_db)):
     """Delete a threat by ID."""
-    if crud.delete_threat(db, threat_id):
+    if await crud.delete_threat(db, threat_id):
         return {"message": f"Threat {threat_id} deleted successfully", "id": threat_id}
     raise HTTPException(status_code=404, detail=f"Threat with ID {threat_id} not found")
 
@@ -196,9 +294,9 @@ def delete_threat(threat_id: int, db: Session = Depends(get_db)):
     summary="Get threat statistics",
     description="Retrieve aggregated statistics about stored IOCs."
 )
-def get_statistics(db: Session = Depends(get_db)):
+async def get_statistics(db: AsyncSession = Depends(get_db)):
     """Get threat count statistics grouped by type and severity."""
-    return crud.get_statistics(db)
+    return await crud.get_statistics(db)
 
 
 # ==================== Serve Frontend ====================
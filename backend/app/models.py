@@ -22,14 +22,16 @@ class Threat(Base):
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     type = Column(String(20), nullable=False, index=True)
-    value = Column(String(500), nullable=False, unique=True)
+    value = Column(String(500), nullable=False, unique=True, index=True)
     severity = Column(String(10), nullable=False, index=True)
-    date_detected = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+    date_detected = Column(DateTime, default=datetime.utcnow, nullable=False)
     source = Column(String(100), nullable=True)
 
-    # Composite index for common query patterns
+    # Indexes matching the list query (optional filters, newest first), so
+    # ORDER BY date_detected DESC LIMIT is served by an index range scan
     __table_args__ = (
-        Index('ix_threats_type_severity', 'type', 'severity'),
+        Index('ix_threats_date_desc', date_detected.desc()),
+        Index('ix_threats_type_severity_date', 'type', 'severity', date_detected.desc()),
     )
 
     def __repr__(self):
@@ -5,7 +5,7 @@ These schemas auto-generate the OpenAPI documentation.
 from datetime import datetime
 from enum import Enum
 from typing import Optional, List
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 
 
 class ThreatType(str, Enum):
@@ -30,19 +30,21 @@ class ThreatBase(BaseModel):
     severity: SeverityLevel = Field(..., description="Threat severity level")
     source: Optional[str] = Field(None, max_length=100, description="Source of the IOC (e.g., Firewall, SIEM)")
 
-    @validator('value')
+    @field_validator('value', mode='before')
+    @classmethod
     def value_not_empty(cls, v):
-        if not v.strip():
-            raise ValueError('Value cannot be empty or whitespace')
-        return v.strip()
+        # Runs on the raw input, so min_length/max_length apply to the stripped value
+        if isinstance(v, str):
+            v = v.strip()
+            if not v:
+                raise ValueError('Value cannot be empty or whitespace')
+        return v
 
 
 class ThreatCreate(ThreatBase):
     """Schema for creating a new threat (POST request body)."""
-    pass
-
-    class Config:
-        schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "type": "IP",
                 "value": "192.168.1.50",
@@ -50,6 +52,7 @@ class ThreatCreate(ThreatBase):
                 "source": "Firewall-01"
             }
         }
+    )
 
 
 class ThreatResponse(ThreatBase):
@@ -57,9 +60,9 @@ class ThreatResponse(ThreatBase):
     id: int = Field(..., description="Unique threat identifier")
     date_detected: datetime = Field(..., description="Timestamp when the IOC was detected")
 
-    class Config:
-        orm_mode = True
-        schema_extra = {
+    model_config = ConfigDict(
+        from_attributes=True,
+        json_schema_extra={
             "example": {
                 "id": 1,
                 "type": "IP",
@@ -69,6 +72,7 @@ class ThreatResponse(ThreatBase):
                 "date_detected": "2026-02-03T14:30:00"
             }
         }
+    )
 
 
 class ThreatList(BaseModel):
@@ -77,6 +81,13 @@ class ThreatList(BaseModel):
     threats: List[ThreatResponse] = Field(..., description="List of threats")
 
 
+class BulkCreateResponse(BaseModel):
+    """Result of a bulk threat registration."""
+    received: int = Field(..., description="Number of IOCs in the request")
+    created: int = Field(..., description="Number of new IOCs stored")
+    duplicates: int = Field(..., description="Number of IOCs skipped because they already exist")
+
+
 class HealthResponse(BaseModel):
     """Health check response schema."""
     status: str = Field(..., description="Service status")
@@ -8,12 +8,17 @@ Usage:
 This simulates an automated detection system sending IOCs to the manager.
 """
 
-import requests
+import asyncio
+import httpx
 import random
 from datetime import datetime
 
 # Configuration
 API_URL = "http://localhost:8000/api/threats"
+BULK_API_URL = "http://localhost:8000/api/threats/bulk"
+
+# Maximum number of requests in flight at once
+MAX_CONCURRENCY = 10
 
 # Sample data for demonstration
 SAMPLE_IPS = [
@@ -41,11 +46,12 @@ SOURCES = ["Firewall-01", "IDS-Suricata", "SIEM-Alert", "VirusTotal", "AbuseIPDB
 SEVERITIES = ["High", "Medium", "Low"]
 
 
-def report_ioc(ioc_type: str, value: str, severity: str, source: str) -> dict:
+async def report_ioc(client: httpx.AsyncClient, ioc_type: str, value: str, severity: str, source: str) -> dict:
     """
     Send an IOC to the API.
     
     Args:
+        client: Shared HTTP client (keeps connections alive)
         ioc_type: Type of IOC (IP, Hash, URL, Domain)
         value: The indicator value
         severity: Threat level (High, Medium, Low)
@@ -62,7 +68,7 @@ def report_ioc(ioc_type: str, value: str, severity: str, source: str) -> dict:
     }
     
     try:
-        response = requests.post(API_URL, json=payload)
+        response = await client.post(API_URL, json=payload)
         
         if response.status_code == 201:
             data = response.json()
@@ -75,14 +81,45 @@ def report_ioc(ioc_type: str, value: str, severity: str, source: str) -> dict:
             print(f"❌ Error: {response.status_code} - {response.text}")
             return {"error": response.text}
             
-    except requests.exceptions.ConnectionError:
+    except httpx.ConnectError:
         print(f"❌ Cannot connect to API at {API_URL}")
         return {"error": "Connection failed"}
 
 
-def simulate_detections(count: int = 5):
+async def report_iocs_bulk(client: httpx.AsyncClient, payloads: list) -> dict:
+    """
+    Send many IOCs in a single request to the bulk endpoint.
+    
+    Args:
+        client: Shared HTTP client
+        payloads: List of IOC dicts (type, value, severity, source)
+    
+    Returns:
+        API response as dict (received, created, duplicates)
+    """
+    try:
+        response = await client.post(BULK_API_URL, json=payloads)
+        
+        if response.status_code == 201:
+            data = response.json()
+            print(f"✅ Bulk upload: {data['created']} created, {data['duplicates']} duplicates")
+            return data
+        else:
+            print(f"❌ Error: {response.status_code} - {response.text}")
+            return {"error": response.text}
+            
+    except httpx.ConnectError:
+        print(f"❌ Cannot connect to API at {BULK_API_URL}")
+        return {"error": "Connection failed"}
+
+
+async def simulate_detections(count: int = 5, bulk: bool = False):
     """
     Simulate automated IOC detections.
+    
+    With bulk=True all detections are sent in one request to the bulk
+    endpoint; otherwise they are reported individually and concurrently
+    (up to MAX_CONCURRENCY in flight) over a single HTTP client.
     """
     print(f"\n🔍 Simulating {count} IOC detections...\n")
     print("-" * 60)
@@ -94,24 +131,41 @@ def simulate_detections(count: int = 5):
         "Domain": SAMPLE_DOMAINS
     }
     
+    detections = []
     for i in range(count):
         ioc_type = random.choice(list(samples.keys()))
         value = random.choice(samples[ioc_type])
         severity = random.choice(SEVERITIES)
         source = random.choice(SOURCES)
-        
-        report_ioc(ioc_type, value, severity, source)
+        detections.append((ioc_type, value, severity, source))
+    
+    semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
+    
+    async def limited_report(client, detection):
+        async with semaphore:
+            return await report_ioc(client, *detection)
+    
+    async with httpx.AsyncClient() as client:
+        if bulk:
+            payloads = [
+                {"type": t, "value": v, "severity": sev, "source": src}
+                for t, v, sev, src in detections
+            ]
+            await report_iocs_bulk(client, payloads)
+        else:
+            await asyncio.gather(*(limited_report(client, d) for d in detections))
     
     print("-" * 60)
     print(f"\n✅ Simulation complete. Check the dashboard at http://localhost:8000")
 
 
-def get_all_threats():
+async def get_all_threats():
     """
     Retrieve all threats from the API.
     """
     try:
-        response = requests.get(API_URL)
+        async with httpx.AsyncClient() as client:
+            response = await client.get(API_URL)
         threats = response.json()
         
         print(f"\n📊 Total IOCs in database: {len(threats)}\n")
@@ -122,7 +176,7 @@ def get_all_threats():
         if len(threats) > 10:
             print(f"  ... and {len(threats) - 10} more")
             
-    except requests.exceptions.ConnectionError:
+    except httpx.ConnectError:
         print(f"❌ Cannot connect to API at {API_URL}")
 
 
@@ -131,9 +185,13 @@ if __name__ == "__main__":
     print("🛡️  IOC Manager - Example Detector Script")
     print("=" * 60)
     
-    # Simulate some detections
-    simulate_detections(8)
+    # Simulate some detections, one request per IOC
+    asyncio.run(simulate_detections(8))
+    
+    # Send a batch of the same size through the bulk endpoint in one request
+    # (samples repeat, so most of these are reported back as duplicates)
+    asyncio.run(simulate_detections(8, bulk=True))
     
     # Show current state
     print("\n")
-    get_all_threats()
+    asyncio.run(get_all_threats())